@@ -0,0 +1,52 @@
+# bench_client.py
+# Compara o padrão ingênuo de test_api.call_api (uma conexão requests.post por
+# chamada, em série) com o IAServiceClient (pool + concorrência) e com o
+# IAServiceClient agrupando chamadas nas rotas /batch.
+# Requer a API rodando: uvicorn main:app --port 8000
+# Uso: python bench_client.py [chamadas] [repeticoes]  (vale o melhor tempo)
+import asyncio
+import json
+import sys
+
+import requests
+
+from bench_utils import best_of
+from client import DEFAULT_BASE_URL, IAServiceClient
+
+TOKEN = "secrettoken123"
+
+
+def _cpfs(n: int):
+    return [f"{i:011d}" for i in range(n)]
+
+
+def naive(n: int):
+    # mesmo padrão do call_api dos test_api.py
+    for cpf in _cpfs(n):
+        resp = requests.post(f"{DEFAULT_BASE_URL}/classificacaoCliente",
+                             headers={"Content-Type": "application/json", "Authorization": f"Bearer {TOKEN}"},
+                             data=json.dumps({"cpf": cpf}))
+        resp.raise_for_status()
+
+
+async def pooled(n: int, batch_window: float):
+    async with IAServiceClient(token=TOKEN, max_connections=4, batch_window=batch_window) as api:
+        results = await asyncio.gather(*(api.classificacao_cliente(cpf) for cpf in _cpfs(n)))
+    assert len(results) == n
+
+
+def main(n: int, repeat: int):
+    runs = [
+        ("call_api (requests.post)", lambda: naive(n)),
+        ("IAServiceClient", lambda: asyncio.run(pooled(n, 0.0))),
+        ("IAServiceClient + batch", lambda: asyncio.run(pooled(n, 0.005))),
+    ]
+    print(f"{'cliente':<26} {'s':>8} {'chamadas/s':>11}")
+    for name, fn in runs:
+        dt, _ = best_of(fn, repeat)
+        print(f"{name:<26} {dt:>8.3f} {n / dt:>11.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 3)
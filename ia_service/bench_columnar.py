@@ -0,0 +1,39 @@
+# bench_columnar.py
+# Compara custo de serialização e tamanho do payload: JSON x Arrow IPC x Parquet.
+# Uso: python bench_columnar.py [n_linhas]
+import json
+import sys
+
+import models_sim as sim
+import columnar
+from bench_utils import best_of
+
+
+def _rows(model: str, n: int):
+    if model == "predicaoVenda_sim":
+        return [sim.predicao_venda(i % 12 + 1, 2000 + i % 30) for i in range(n)]
+    if model == "classificacaoCliente_sim":
+        return [sim.classificacao_cliente(f"{i:011d}") for i in range(n)]
+    if model == "predicaoDemanda_sim":
+        return [sim.predicao_demanda(f"SKU-{i}", "2025-01:2025-12") for i in range(n)]
+    return [sim.classificacao_sentimento(f"Produto {i} foi ótimo, mas a entrega foi ruim") for i in range(n)]
+
+
+def main(n: int):
+    if not columnar.available():
+        sys.exit("pyarrow não instalado")
+    print(f"{'modelo':<28} {'formato':<8} {'ms':>9} {'bytes':>11}")
+    for model in columnar.SCHEMAS:
+        rows = _rows(model, n)
+        candidates = {
+            "json": lambda: json.dumps(rows).encode("utf-8"),
+            "arrow": lambda: b"".join(columnar.iter_arrow_stream(model, rows)),
+            "parquet": lambda: columnar.to_parquet(model, rows),
+        }
+        for name, fn in candidates.items():
+            dt, body = best_of(fn)
+            print(f"{model:<28} {name:<8} {dt * 1000:>9.2f} {len(body):>11}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,75 @@
+# bench_fields.py
+# Mede o ganho da projeção de campos (?fields=), completa x só os campos pedidos:
+# - em processo: tempo de cálculo do modelo + json.dumps e bytes do corpo;
+# - via HTTP (API rodando em BASE_URL): latência ponta a ponta de um POST em
+#   conexão keep-alive e bytes recebidos.
+# Uso: python bench_fields.py [iteracoes]
+import json
+import sys
+
+import requests
+
+import models_sim as sim
+from bench_utils import us_per_call
+
+BASE_URL = "http://127.0.0.1:8000"
+TOKEN = "secrettoken123"
+TEXTO = "O produto foi ótimo, adorei, mas a entrega foi ruim. " * 200
+
+# endpoint, campos projetados, payload, função do modelo
+CASES = [
+    ("/predicaoVenda", {"predicted_sales"}, {"mes": 12, "ano": 2025},
+     lambda f: sim.predicao_venda(12, 2025, f)),
+    ("/classificacaoCliente", {"score", "category"}, {"cpf": "111.444.777-35"},
+     lambda f: sim.classificacao_cliente("111.444.777-35", f)),
+    ("/predicaoDemanda", {"total_estimate"}, {"product_id": "SKU-9876", "period": "2020-01:2025-12"},
+     lambda f: sim.predicao_demanda("SKU-9876", "2020-01:2025-12", f)),
+    ("/classificacaoSentimento", {"label"}, {"text": TEXTO},
+     lambda f: sim.classificacao_sentimento(TEXTO, f)),
+]
+
+
+def _variants(fields):
+    return (("(todos)", None), (",".join(sorted(fields)), fields))
+
+
+def in_process(n: int):
+    print("em processo (modelo + json.dumps)")
+    print(f"{'endpoint':<26} {'fields':<18} {'us':>9} {'bytes':>7}")
+    for endpoint, fields, _, score in CASES:
+        for label, f in _variants(fields):
+            dt = us_per_call(lambda: json.dumps(score(f)), n)
+            print(f"{endpoint:<26} {label:<18} {dt:>9.2f} {len(json.dumps(score(f))):>7}")
+
+
+def over_http(n: int):
+    print(f"HTTP ({BASE_URL}, keep-alive)")
+    print(f"{'endpoint':<26} {'fields':<18} {'us':>9} {'bytes':>7}")
+    with requests.Session() as http:
+        http.headers.update({"Content-Type": "application/json", "Authorization": f"Bearer {TOKEN}"})
+        for endpoint, fields, payload, _ in CASES:
+            body = json.dumps(payload)
+            for label, f in _variants(fields):
+                params = {"fields": label} if f else None
+
+                def call():
+                    resp = http.post(BASE_URL + endpoint, data=body, params=params)
+                    resp.raise_for_status()
+                    return resp
+
+                size = len(call().content)
+                dt = us_per_call(call, n)
+                print(f"{endpoint:<26} {label:<18} {dt:>9.2f} {size:>7}")
+
+
+def main(n: int):
+    in_process(n)
+    print()
+    try:
+        over_http(max(1, n // 10))
+    except requests.ConnectionError:
+        print(f"API fora do ar em {BASE_URL}: medição HTTP ignorada (uvicorn main:app --port 8000)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,43 @@
+# bench_msgpack.py
+# Compara JSON x msgpack por endpoint: tempo de parse da requisição (decode +
+# validação Pydantic), tempo de serialização da resposta e tamanho dos payloads.
+# Uso: python bench_msgpack.py [iteracoes]
+import json
+import sys
+
+import msgpack
+
+import main
+import models_sim as sim
+from bench_utils import us_per_call
+
+ENDPOINTS = {
+    "/predicaoVenda": (main.PredicaoVendaRequest, {"mes": 12, "ano": 2025},
+                       lambda r: sim.predicao_venda(r.mes, r.ano)),
+    "/classificacaoCliente": (main.ClassificacaoClienteRequest, {"cpf": "111.444.777-35"},
+                              lambda r: sim.classificacao_cliente(r.cpf)),
+    "/predicaoDemanda": (main.PredicaoDemandaRequest, {"product_id": "SKU-9876", "period": "2024-01:2025-12"},
+                         lambda r: sim.predicao_demanda(r.product_id, r.period)),
+    "/classificacaoSentimento": (main.ClassificacaoSentimentoRequest, {"text": "O produto foi ótimo, adorei! " * 20},
+                                 lambda r: sim.classificacao_sentimento(r.text)),
+}
+
+CODECS = {
+    "json": (lambda o: json.dumps(o).encode("utf-8"), json.loads),
+    "msgpack": (lambda o: msgpack.packb(o, use_bin_type=True), lambda b: msgpack.unpackb(b, raw=False)),
+}
+
+
+def main_bench(n: int):
+    print(f"{'endpoint':<26} {'codec':<8} {'parse us':>9} {'ser us':>9} {'req B':>7} {'resp B':>7}")
+    for endpoint, (model_cls, payload, score) in ENDPOINTS.items():
+        result = score(model_cls(**payload))
+        for name, (dumps, loads) in CODECS.items():
+            body = dumps(payload)
+            parse = us_per_call(lambda: model_cls.parse_obj(loads(body)), n)
+            ser = us_per_call(lambda: dumps(result), n)
+            print(f"{endpoint:<26} {name:<8} {parse:>9.2f} {ser:>9.2f} {len(body):>7} {len(dumps(result)):>7}")
+
+
+if __name__ == "__main__":
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
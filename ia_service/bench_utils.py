@@ -0,0 +1,27 @@
+# bench_utils.py
+# Funções de medição comuns aos scripts bench_*.py.
+import time
+
+
+def us_per_call(fn, n: int) -> float:
+    # tempo médio por chamada, em microssegundos
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def best_of(fn, repeat: int = 5):
+    """
+    Executa fn `repeat` vezes e devolve (melhor tempo em segundos, resultado
+    da última execução). Para operações longas, em que a média por chamada
+    de us_per_call não faz sentido.
+    """
+    best = None
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, out
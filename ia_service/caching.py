@@ -0,0 +1,58 @@
+# caching.py
+# ETag e requisições condicionais para os endpoints determinísticos.
+# A resposta só muda em `generated_at`, então o ETag é fraco (W/) e calculado
+# a partir da versão do modelo + entrada normalizada, sem rodar o modelo.
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+
+from fastapi import Response, status
+
+import models_sim as sim
+
+# IA_ETAG=0 desliga ETag / 304 / Cache-Control
+ETAG_ENABLED = os.getenv("IA_ETAG", "1") != "0"
+CACHE_MAX_AGE = int(os.getenv("IA_CACHE_MAX_AGE", "3600"))
+
+
+def etag_for(model: str, params: Dict[str, Any], representation: str) -> Optional[str]:
+    """
+    params: entrada já validada pelo Pydantic (req.dict()).
+    representation: formato do corpo (json, msgpack, ...), já que o ETag
+    identifica a representação e não só o resultado.
+    """
+    if not ETAG_ENABLED:
+        return None
+    normalized = json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    key = "|".join((model, sim.MODEL_VERSION, representation, normalized))
+    return 'W/"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    # comparação fraca (RFC 9110): ignora o prefixo W/. "*" não é aceito aqui,
+    # pois em POST o 304 só faz sentido para uma representação conhecida.
+    if not if_none_match or not etag:
+        return False
+    opaque = etag[2:]
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == opaque:
+            return True
+    return False
+
+
+def headers(etag: Optional[str]) -> Optional[Dict[str, str]]:
+    if not etag:
+        return None
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CACHE_MAX_AGE}",
+        "Vary": "Accept, Authorization",
+    }
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers(etag))
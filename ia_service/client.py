@@ -0,0 +1,227 @@
+# client.py
+# Cliente assíncrono para o ia_service: pool de conexões persistente, limite de
+# concorrência, retry com backoff e agrupamento automático de chamadas unitárias
+# nas rotas /batch.
+#
+# Uso:
+#     async with IAServiceClient(token="secrettoken123") as api:
+#         r = await api.classificacao_cliente("111.444.777-35")
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
+import asyncio
+import random
+
+import httpx
+
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
+
+# status em que vale a pena tentar de novo (sobrecarga / falha temporária)
+RETRY_STATUS = {429, 502, 503, 504}
+
+
+class IAServiceError(Exception):
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _raise_for_status(resp: httpx.Response):
+    if resp.status_code < 400:
+        return
+    try:
+        detail = resp.json().get("detail")
+    except ValueError:
+        detail = resp.text
+    raise IAServiceError(resp.status_code, detail)
+
+
+async def _aiter(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+class _Batcher:
+    """
+    Junta chamadas unitárias de um endpoint e envia tudo em uma única
+    requisição para `<endpoint>/batch`, quando a janela de tempo expira ou
+    o lote enche.
+    """
+
+    def __init__(self, client: "IAServiceClient", endpoint: str, params: Optional[Dict[str, str]], max_size: int, window: float):
+        self._client = client
+        self._endpoint = endpoint
+        self._params = params
+        self._max_size = max_size
+        self._window = window
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((payload, fut))
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if items:
+            task = asyncio.ensure_future(self._send(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, items: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            results = await self._client._post(self._endpoint + "/batch", {"items": [p for p, _ in items]}, self._params)
+        except IAServiceError as e:
+            if e.status_code in (400, 422) and len(items) > 1:
+                # um item inválido derruba o lote inteiro: reenvia um a um para
+                # que só a chamada com problema receba o erro
+                await asyncio.gather(*(self._send_one(p, f) for p, f in items))
+                return
+            self._fail(items, e)
+        except Exception as e:
+            self._fail(items, e)
+        else:
+            for (_, fut), result in zip(items, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    async def _send_one(self, payload: Dict[str, Any], fut: asyncio.Future):
+        try:
+            result = await self._client._post(self._endpoint, payload, self._params)
+        except Exception as e:
+            if not fut.done():
+                fut.set_exception(e)
+        else:
+            if not fut.done():
+                fut.set_result(result)
+
+    @staticmethod
+    def _fail(items, exc: Exception):
+        for _, fut in items:
+            if not fut.done():
+                fut.set_exception(exc)
+
+    async def drain(self):
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class IAServiceClient:
+    """
+    max_connections: tamanho do pool de conexões keep-alive.
+    max_concurrency: requisições HTTP simultâneas (padrão = max_connections).
+    retries / backoff: novas tentativas em erro de rede ou 429/502/503/504,
+        com espera exponencial (backoff * 2**tentativa) e jitter.
+    batch_window: se > 0, chamadas unitárias feitas dentro dessa janela (em
+        segundos) são agrupadas na rota /batch do endpoint; 0 desliga.
+    max_batch_size: tamanho máximo de cada lote.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, token: Optional[str] = None,
+                 max_connections: int = 10, max_concurrency: Optional[int] = None,
+                 retries: int = 3, backoff: float = 0.1, timeout: float = 10.0,
+                 batch_window: float = 0.0, max_batch_size: int = 256):
+        headers = {"Content-Type": "application/json"}
+        if token is not None:
+            headers["Authorization"] = f"Bearer {token}"
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._sem = asyncio.Semaphore(max_concurrency or max_connections)
+        self._retries = retries
+        self._backoff = backoff
+        self._batch_window = batch_window
+        self._max_batch_size = max_batch_size
+        self._batchers: Dict[Tuple[str, Optional[str]], _Batcher] = {}
+
+    async def __aenter__(self) -> "IAServiceClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        for batcher in self._batchers.values():
+            await batcher.drain()
+        await self._http.aclose()
+
+    async def _post(self, endpoint: str, payload: Any, params: Optional[Dict[str, str]] = None) -> Any:
+        attempt = 0
+        while True:
+            try:
+                async with self._sem:
+                    resp = await self._http.post(endpoint, json=payload, params=params)
+            except httpx.TransportError:
+                if attempt >= self._retries:
+                    raise
+            else:
+                if resp.status_code < 400:
+                    return resp.json()
+                if resp.status_code not in RETRY_STATUS or attempt >= self._retries:
+                    _raise_for_status(resp)
+            await asyncio.sleep(self._backoff * (2 ** attempt) * (0.5 + random.random()))
+            attempt += 1
+
+    async def _call(self, endpoint: str, payload: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+        joined = ",".join(fields) if fields else None
+        params = {"fields": joined} if joined else None
+        if self._batch_window <= 0:
+            return await self._post(endpoint, payload, params)
+        # só entram no mesmo lote chamadas com a mesma projeção de campos
+        key = (endpoint, joined)
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            batcher = self._batchers[key] = _Batcher(self, endpoint, params, self._max_batch_size, self._batch_window)
+        return await batcher.submit(payload)
+
+    # --- Endpoints ---
+    # fields: campos desejados na resposta (ex.: ["score", "category"]); None = todos
+    async def predicao_venda(self, mes: int, ano: int, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        return await self._call("/predicaoVenda", {"mes": mes, "ano": ano}, fields)
+
+    async def classificacao_cliente(self, cpf: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        return await self._call("/classificacaoCliente", {"cpf": cpf}, fields)
+
+    async def predicao_demanda(self, product_id: str, period: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        return await self._call("/predicaoDemanda", {"product_id": product_id, "period": period}, fields)
+
+    async def classificacao_sentimento(self, text: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        return await self._call("/classificacaoSentimento", {"text": text}, fields)
+
+    async def classificacao_sentimento_stream(self, content: Union[str, bytes, AsyncIterable[bytes], Iterable[bytes]],
+                                              fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Envia o texto para /classificacaoSentimento/stream sem montar o corpo
+        inteiro em memória quando `content` é um iterável de bytes. Não há
+        retry nem agrupamento: um iterável não pode ser reenviado.
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        elif not isinstance(content, bytes) and not hasattr(content, "__aiter__"):
+            # httpx.AsyncClient só aceita iteráveis assíncronos como corpo
+            content = _aiter(content)
+        params = {"fields": ",".join(fields)} if fields else None
+        async with self._sem:
+            resp = await self._http.post("/classificacaoSentimento/stream", content=content, params=params,
+                                         headers={"Content-Type": "text/plain; charset=utf-8"})
+        _raise_for_status(resp)
+        return resp.json()
+
+    async def health(self) -> Dict[str, Any]:
+        async with self._sem:
+            resp = await self._http.get("/health")
+        _raise_for_status(resp)
+        return resp.json()
@@ -0,0 +1,125 @@
+# columnar.py
+# Saída colunar (Apache Arrow IPC stream / Parquet) para as rotas em lote.
+from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import io
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional: sem ele só JSON fica disponível
+    pa = None
+
+JSON = "application/json"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+
+# linhas por record batch / row group
+CHUNK_SIZE = 1024
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def media_types() -> Tuple[str, ...]:
+    # formatos colunares que podem ser oferecidos na negociação do Accept
+    return (ARROW_STREAM, PARQUET) if pa is not None else ()
+
+
+def _build_schemas() -> Dict[str, Any]:
+    if pa is None:
+        return {}
+    # colunas categóricas como dictionary: poucos valores distintos, muitas linhas
+    cat = pa.dictionary(pa.int8(), pa.string())
+    return {
+        "predicaoVenda_sim": pa.schema([
+            ("model", cat),
+            ("mes", pa.int8()),
+            ("ano", pa.int16()),
+            ("predicted_sales", pa.int64()),
+            ("confidence", pa.float64()),
+            ("generated_at", pa.string()),
+        ]),
+        "classificacaoCliente_sim": pa.schema([
+            ("model", cat),
+            ("cpf", pa.string()),
+            ("valid_cpf", pa.bool_()),
+            ("score", pa.int16()),
+            ("category", cat),
+            ("risk_level", cat),
+            ("confidence", pa.float64()),
+            ("generated_at", pa.string()),
+        ]),
+        "predicaoDemanda_sim": pa.schema([
+            ("model", cat),
+            ("product_id", pa.string()),
+            ("period", pa.string()),
+            ("months", pa.int32()),
+            ("monthly_estimate", pa.list_(pa.int32())),
+            ("total_estimate", pa.int64()),
+            ("confidence", pa.float64()),
+            ("generated_at", pa.string()),
+        ]),
+        "classificacaoSentimento_sim": pa.schema([
+            ("model", cat),
+            ("text", pa.string()),
+            ("pos_count", pa.int32()),
+            ("neg_count", pa.int32()),
+            ("score", pa.float64()),
+            ("label", cat),
+            ("confidence", pa.float64()),
+            ("generated_at", pa.string()),
+        ]),
+    }
+
+
+SCHEMAS = _build_schemas()
+
+
+def schema_for(model: str, fields: Optional[AbstractSet[str]] = None):
+    # projeção: só as colunas pedidas, na ordem do schema completo
+    schema = SCHEMAS[model]
+    if fields is None:
+        return schema
+    return pa.schema([f for f in schema if f.name in fields])
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_arrow_stream(model: str, rows: Iterable[Dict[str, Any]], fields: Optional[AbstractSet[str]] = None,
+                      chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Gera o Arrow IPC stream por partes: cada bloco de `chunk_size` linhas
+    vira um record batch e é enviado assim que é pontuado.
+    """
+    schema = schema_for(model, fields)
+    sink = io.BytesIO()
+    writer = pa_ipc.new_stream(sink, schema)
+    for chunk in _chunks(rows, chunk_size):
+        writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate(0)
+    writer.close()
+    yield sink.getvalue()
+
+
+def to_parquet(model: str, rows: Iterable[Dict[str, Any]], fields: Optional[AbstractSet[str]] = None,
+               chunk_size: int = CHUNK_SIZE) -> bytes:
+    # Parquet precisa do rodapé no fim do arquivo, então o corpo é montado inteiro
+    schema = schema_for(model, fields)
+    sink = io.BytesIO()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in _chunks(rows, chunk_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+    return sink.getvalue()
@@ -0,0 +1,61 @@
+# content_negotiation.py
+# Escolha do formato de resposta a partir do header Accept (com q-values).
+from typing import List, Optional, Sequence, Tuple
+
+
+def parse_accept(accept: Optional[str]) -> List[Tuple[str, float]]:
+    """
+    Lista (media type, q) na ordem do header. q ausente vale 1; q inválido
+    descarta o item.
+    """
+    ranges = []
+    if not accept:
+        return ranges
+    for part in accept.split(","):
+        params = part.split(";")
+        media = params[0].strip().lower()
+        if not media:
+            continue
+        q = 1.0
+        for param in params[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = -1.0
+        if 0.0 <= q <= 1.0:
+            ranges.append((media, q))
+    return ranges
+
+
+def _specificity(media_range: str, media: str) -> int:
+    # 2 = tipo exato, 1 = type/*, 0 = */*, -1 = não casa
+    if media_range == media:
+        return 2
+    if media_range == "*/*":
+        return 0
+    if media_range.endswith("/*") and media.startswith(media_range[:-1]):
+        return 1
+    return -1
+
+
+def negotiate(accept: Optional[str], offered: Sequence[str], default: Optional[str] = None) -> Optional[str]:
+    """
+    Devolve o tipo de `offered` com maior q no Accept (RFC 9110, 12.5.1):
+    cada tipo oferecido recebe o q do range mais específico que o casa
+    (exato > type/* > */*), tipos com q=0 são descartados e o empate fica
+    com a ordem de `offered`. Sem Accept ou sem nenhum tipo aceitável,
+    devolve `default`.
+    """
+    ranges = parse_accept(accept)
+    best, best_q = default, 0.0
+    for media in offered:
+        q, specificity = 0.0, -1
+        for media_range, range_q in ranges:
+            s = _specificity(media_range, media)
+            if s > specificity:
+                q, specificity = range_q, s
+        if q > best_q:
+            best, best_q = media, q
+    return best
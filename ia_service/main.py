@@ -1,11 +1,20 @@
 # main.py
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence
+import codecs
+import email.message
 from auth import require_token
 import models_sim as sim
+import columnar
+import msgpack_codec
+import caching
+import content_negotiation
 
 app = FastAPI(title="IA-as-a-Service (simulado)", version="1.0")
+# todas as rotas aceitam corpo JSON (padrão) ou msgpack, conforme o Content-Type
+app.router.route_class = msgpack_codec.MsgpackRoute
 
 # --- Request / Response models ---
 class PredicaoVendaRequest(BaseModel):
@@ -22,41 +31,175 @@ class PredicaoDemandaRequest(BaseModel):
 class ClassificacaoSentimentoRequest(BaseModel):
     text: str = Field(..., example="O produto foi ótimo, adorei!")
 
+# --- Lote (bulk) ---
+class PredicaoVendaBatchRequest(BaseModel):
+    items: List[PredicaoVendaRequest] = Field(..., min_items=1)
+
+class ClassificacaoClienteBatchRequest(BaseModel):
+    items: List[ClassificacaoClienteRequest] = Field(..., min_items=1)
+
+class PredicaoDemandaBatchRequest(BaseModel):
+    items: List[PredicaoDemandaRequest] = Field(..., min_items=1)
+
+class ClassificacaoSentimentoBatchRequest(BaseModel):
+    items: List[ClassificacaoSentimentoRequest] = Field(..., min_items=1)
+
+# fields=a,b,c em qualquer rota: devolve só esses campos (e não calcula os outros)
+FIELDS_QUERY = Query(None, description="Lista de campos da resposta separados por vírgula", example="score,category")
+
+def _parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[FrozenSet[str]]:
+    if fields is None:
+        return None
+    wanted = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    if not wanted:
+        raise HTTPException(status_code=400, detail="fields must list at least one field")
+    unknown = wanted.difference(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}")
+    return wanted
+
+def _batch_response(model: str, rows: Iterable[Dict[str, Any]], accept: Optional[str], fields: Optional[FrozenSet[str]] = None):
+    """
+    Resposta das rotas em lote: JSON (padrão), msgpack, Arrow IPC stream ou
+    Parquet, escolhido pelo header Accept.
+    """
+    # uma única negociação entre todos os formatos, para que os q-values
+    # decidam entre msgpack e os formatos colunares
+    # (só entram os formatos cujas dependências opcionais estão instaladas)
+    offered = (columnar.JSON,) + msgpack_codec.media_types() + columnar.media_types()
+    fmt = content_negotiation.negotiate(accept, offered) if accept else columnar.JSON
+    if fmt is None:
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=f"No acceptable format. Available: {', '.join(offered)}")
+    if fmt in msgpack_codec.media_types():
+        return msgpack_codec.MsgpackResponse(list(rows))
+    if fmt == columnar.JSON:
+        return list(rows)
+    if fmt == columnar.ARROW_STREAM:
+        return StreamingResponse(columnar.iter_arrow_stream(model, rows, fields), media_type=columnar.ARROW_STREAM)
+    return Response(content=columnar.to_parquet(model, rows, fields), media_type=columnar.PARQUET)
+
+def _representation(accept: Optional[str], fields: Optional[FrozenSet[str]]) -> str:
+    fmt = "msgpack" if msgpack_codec.accepts(accept) else "json"
+    return fmt if fields is None else fmt + ";fields=" + ",".join(sorted(fields))
+
+def _respond(result: Dict[str, Any], accept: Optional[str], headers: Optional[Dict[str, str]] = None):
+    # JSON continua o padrão; msgpack só quando pedido no Accept
+    if msgpack_codec.accepts(accept):
+        return msgpack_codec.MsgpackResponse(result, headers=headers)
+    return JSONResponse(result, headers=headers)
+
 # --- Endpoints (protegidos) ---
 @app.post("/predicaoVenda")
-def predicao_venda(req: PredicaoVendaRequest, token: str = Depends(require_token)):
+def predicao_venda(req: PredicaoVendaRequest, fields: Optional[str] = FIELDS_QUERY, accept: Optional[str] = Header(None), if_none_match: Optional[str] = Header(None), token: str = Depends(require_token)):
+    wanted = _parse_fields(fields, sim.FIELDS["predicaoVenda_sim"])
+    etag = caching.etag_for("predicaoVenda_sim", req.dict(), _representation(accept, wanted))
+    if caching.matches(if_none_match, etag):
+        return caching.not_modified(etag)
     try:
-        result = sim.predicao_venda(req.mes, req.ano)
-        return result
+        result = sim.predicao_venda(req.mes, req.ano, wanted)
+        return _respond(result, accept, caching.headers(etag))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/classificacaoCliente")
-def classificacao_cliente(req: ClassificacaoClienteRequest, token: str = Depends(require_token)):
+def classificacao_cliente(req: ClassificacaoClienteRequest, fields: Optional[str] = FIELDS_QUERY, accept: Optional[str] = Header(None), if_none_match: Optional[str] = Header(None), token: str = Depends(require_token)):
+    wanted = _parse_fields(fields, sim.FIELDS["classificacaoCliente_sim"])
+    etag = caching.etag_for("classificacaoCliente_sim", req.dict(), _representation(accept, wanted))
+    if caching.matches(if_none_match, etag):
+        return caching.not_modified(etag)
     try:
-        result = sim.classificacao_cliente(req.cpf)
-        return result
+        result = sim.classificacao_cliente(req.cpf, wanted)
+        return _respond(result, accept, caching.headers(etag))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/predicaoDemanda")
-def predicao_demanda(req: PredicaoDemandaRequest, token: str = Depends(require_token)):
+def predicao_demanda(req: PredicaoDemandaRequest, fields: Optional[str] = FIELDS_QUERY, accept: Optional[str] = Header(None), if_none_match: Optional[str] = Header(None), token: str = Depends(require_token)):
+    wanted = _parse_fields(fields, sim.FIELDS["predicaoDemanda_sim"])
+    etag = caching.etag_for("predicaoDemanda_sim", req.dict(), _representation(accept, wanted))
+    if caching.matches(if_none_match, etag):
+        return caching.not_modified(etag)
     try:
-        result = sim.predicao_demanda(req.product_id, req.period)
-        return result
+        result = sim.predicao_demanda(req.product_id, req.period, wanted)
+        return _respond(result, accept, caching.headers(etag))
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/classificacaoSentimento")
-def classificacao_sentimento(req: ClassificacaoSentimentoRequest, token: str = Depends(require_token)):
+def classificacao_sentimento(req: ClassificacaoSentimentoRequest, fields: Optional[str] = FIELDS_QUERY, accept: Optional[str] = Header(None), token: str = Depends(require_token)):
+    wanted = _parse_fields(fields, sim.FIELDS["classificacaoSentimento_sim"])
     try:
-        result = sim.classificacao_sentimento(req.text)
-        return result
+        result = sim.classificacao_sentimento(req.text, wanted)
+        return _respond(result, accept)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# --- Endpoints em lote (protegidos) ---
+@app.post("/predicaoVenda/batch")
+def predicao_venda_batch(req: PredicaoVendaBatchRequest, fields: Optional[str] = FIELDS_QUERY, accept: Optional[str] = Header(None), token: str = Depends(require_token)):
+    wanted = _parse_fields(fields, sim.FIELDS["predicaoVenda_sim"])
+    rows = (sim.predicao_venda(it.mes, it.ano, wanted) for it in req.items)
+    return _batch_response("predicaoVenda_sim", rows, accept, wanted)
+
+@app.post("/classificacaoCliente/batch")
+def classificacao_cliente_batch(req: ClassificacaoClienteBatchRequest, fields: Optional[str] = FIELDS_QUERY, accept: Optional[str] = Header(None), token: str = Depends(require_token)):
+    wanted = _parse_fields(fields, sim.FIELDS["classificacaoCliente_sim"])
+    rows = (sim.classificacao_cliente(it.cpf, wanted) for it in req.items)
+    return _batch_response("classificacaoCliente_sim", rows, accept, wanted)
+
+@app.post("/predicaoDemanda/batch")
+def predicao_demanda_batch(req: PredicaoDemandaBatchRequest, fields: Optional[str] = FIELDS_QUERY, accept: Optional[str] = Header(None), token: str = Depends(require_token)):
+    wanted = _parse_fields(fields, sim.FIELDS["predicaoDemanda_sim"])
+    # valida os períodos antes de começar a enviar: depois do primeiro
+    # record batch não dá mais para responder 400
+    for i, it in enumerate(req.items):
+        try:
+            sim.validate_period(it.period)
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=f"items[{i}]: {ve}")
+    rows = (sim.predicao_demanda(it.product_id, it.period, wanted) for it in req.items)
+    return _batch_response("predicaoDemanda_sim", rows, accept, wanted)
+
+@app.post("/classificacaoSentimento/batch")
+def classificacao_sentimento_batch(req: ClassificacaoSentimentoBatchRequest, fields: Optional[str] = FIELDS_QUERY, accept: Optional[str] = Header(None), token: str = Depends(require_token)):
+    wanted = _parse_fields(fields, sim.FIELDS["classificacaoSentimento_sim"])
+    rows = (sim.classificacao_sentimento(it.text, wanted) for it in req.items)
+    return _batch_response("classificacaoSentimento_sim", rows, accept, wanted)
+
+# --- Sentimento em streaming (protegido) ---
+@app.post("/classificacaoSentimento/stream")
+async def classificacao_sentimento_stream(request: Request, fields: Optional[str] = FIELDS_QUERY, accept: Optional[str] = Header(None), token: str = Depends(require_token)):
+    """
+    Corpo bruto (text/plain) lido em pedaços conforme chega: para textos
+    longos só as contagens ficam em memória, e o texto não é devolvido.
+    """
+    wanted = _parse_fields(fields, sim.STREAM_FIELDS)
+    message = email.message.Message()
+    message["content-type"] = request.headers.get("content-type") or "text/plain"
+    charset = message.get_content_charset() or "utf-8"
+    # codecs bytes->bytes (base64, hex, zlib...) e str->str (rot13) também
+    # são registrados no módulo codecs, mas não são charsets de texto: só
+    # vale o codec que decodifica bytes em str
+    try:
+        codec = codecs.lookup(charset)
+        is_text = isinstance(codec.incrementaldecoder().decode(b"", final=True), str)
+    except (LookupError, TypeError, ValueError):
+        is_text = False
+    if not is_text:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"Unsupported charset: {charset}")
+    decoder = codec.incrementaldecoder()
+    acc = sim.SentimentoStream()
+    try:
+        async for chunk in request.stream():
+            acc.feed(decoder.decode(chunk))
+        acc.feed(decoder.decode(b"", final=True))
+    except UnicodeError as e:
+        # UnicodeDecodeError, mas também ex. UTF-16 sem BOM
+        raise HTTPException(status_code=400, detail=f"Invalid {charset} body: {e}")
+    return _respond(acc.result(wanted), accept)
+
 # rota simples para checar status (também protegida)
 @app.get("/health")
 def health(token: str = Depends(require_token)):
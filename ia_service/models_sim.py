@@ -1,10 +1,38 @@
 # models_sim.py
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional, AbstractSet
 import hashlib
 import math
 from datetime import datetime
 import re
 
+# versão dos modelos simulados: entra no ETag das respostas, então deve mudar
+# sempre que a saída de algum modelo mudar para a mesma entrada
+MODEL_VERSION = "1.0"
+
+# campos de saída de cada modelo, na ordem da resposta
+FIELDS = {
+    "predicaoVenda_sim": ("model", "mes", "ano", "predicted_sales", "confidence", "generated_at"),
+    "classificacaoCliente_sim": ("model", "cpf", "valid_cpf", "score", "category", "risk_level", "confidence", "generated_at"),
+    "predicaoDemanda_sim": ("model", "product_id", "period", "months", "monthly_estimate", "total_estimate", "confidence", "generated_at"),
+    "classificacaoSentimento_sim": ("model", "text", "pos_count", "neg_count", "score", "label", "confidence", "generated_at"),
+}
+# a versão em streaming não devolve o texto, só o tamanho
+STREAM_FIELDS = ("model", "chars", "pos_count", "neg_count", "score", "label", "confidence", "generated_at")
+
+# Projeção de campos: fields=None devolve tudo; caso contrário só os campos
+# pedidos, e os que custam algo (série mensal, validação de CPF, eco do texto,
+# timestamp) nem são calculados.
+def _wants(fields: Optional[AbstractSet[str]], name: str) -> bool:
+    return fields is None or name in fields
+
+def _select(out: Dict[str, Any], fields: Optional[AbstractSet[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return out
+    return {k: v for k, v in out.items() if k in fields}
+
+def _now(fields: Optional[AbstractSet[str]]) -> Optional[str]:
+    return datetime.utcnow().isoformat() + "Z" if _wants(fields, "generated_at") else None
+
 def _seed_from_args(*args) -> int:
     joined = "|".join(str(a) for a in args)
     h = hashlib.sha256(joined.encode("utf-8")).hexdigest()
@@ -17,7 +45,7 @@ def _confidence_from_seed(seed: int, low=0.6, high=0.98) -> float:
     return round(low + (high - low) * r, 3)
 
 # Predição de vendas: mês (1-12) e ano (YYYY)
-def predicao_venda(mes: int, ano: int) -> Dict[str, Any]:
+def predicao_venda(mes: int, ano: int, fields: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
     seed = _seed_from_args("predicao_venda", mes, ano)
     # base mensal aleatória determinística
     base = ((ano % 100) * 1000) + (mes * 200) + (seed % 500)
@@ -31,14 +59,14 @@ def predicao_venda(mes: int, ano: int) -> Dict[str, Any]:
         saz = 1.10
     predicted = int(base * saz)
     conf = _confidence_from_seed(seed)
-    return {
+    return _select({
         "model": "predicaoVenda_sim",
         "mes": mes,
         "ano": ano,
         "predicted_sales": predicted,
         "confidence": conf,
-        "generated_at": datetime.utcnow().isoformat() + "Z"
-    }
+        "generated_at": _now(fields)
+    }, fields)
 
 # Validação simples de CPF (algoritmo oficial)
 def _clean_digits(s: str) -> str:
@@ -57,9 +85,9 @@ def validate_cpf(cpf: str) -> bool:
     return cpf[-2:] == f"{first}{second}"
 
 # Classificação de crédito por CPF (simulada determinística)
-def classificacao_cliente(cpf: str) -> Dict[str, Any]:
+def classificacao_cliente(cpf: str, fields: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
     clean = _clean_digits(cpf)
-    valid = validate_cpf(clean)
+    valid = validate_cpf(clean) if _wants(fields, "valid_cpf") else None
     seed = _seed_from_args("classificacao_cliente", clean)
     score = seed % 1000  # 0..999
     # mapear para categorias simples
@@ -76,7 +104,7 @@ def classificacao_cliente(cpf: str) -> Dict[str, Any]:
         cat = "D"
         risk = "Muito Alto"
     conf = _confidence_from_seed(seed)
-    return {
+    return _select({
         "model": "classificacaoCliente_sim",
         "cpf": cpf,
         "valid_cpf": valid,
@@ -84,8 +112,8 @@ def classificacao_cliente(cpf: str) -> Dict[str, Any]:
         "category": cat,
         "risk_level": risk,
         "confidence": conf,
-        "generated_at": datetime.utcnow().isoformat() + "Z"
-    }
+        "generated_at": _now(fields)
+    }, fields)
 
 # Predição de demanda por produto e periodo
 # period: "YYYY-MM" or "YYYY-MM:YYYY-MM"
@@ -108,22 +136,32 @@ def _months_between(start: str, end: str):
         raise ValueError("end must be after or equal to start")
     return months
 
-def predicao_demanda(product_id: str, period: str) -> Dict[str, Any]:
+def validate_period(period: str) -> Tuple[str, str, int]:
+    """
+    Valida o período ("YYYY-MM" ou "YYYY-MM:YYYY-MM") e devolve
+    (início, fim, meses). Levanta ValueError se for inválido.
+    """
     start, end = _parse_period(period)
-    months = _months_between(start, end)
+    return start, end, _months_between(start, end)
+
+def predicao_demanda(product_id: str, period: str, fields: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
+    start, end, months = validate_period(period)
     seed = _seed_from_args("predicao_demanda", product_id, start, end)
     # base mensal dependente do product_id hash
     base_unit = 50 + (seed % 200)  # 50..249
     # add small variation across months deterministically
-    total = 0
-    monthly = []
-    for i in range(months):
-        s = (seed + i * 97) % 1000
-        qty = int(base_unit * (0.8 + (s % 41) / 100.0))  # 0.8..1.2
-        monthly.append(qty)
-        total += qty
+    total = None
+    monthly = [] if _wants(fields, "monthly_estimate") else None
+    if monthly is not None or _wants(fields, "total_estimate"):
+        total = 0
+        for i in range(months):
+            s = (seed + i * 97) % 1000
+            qty = int(base_unit * (0.8 + (s % 41) / 100.0))  # 0.8..1.2
+            if monthly is not None:
+                monthly.append(qty)
+            total += qty
     conf = _confidence_from_seed(seed)
-    return {
+    return _select({
         "model": "predicaoDemanda_sim",
         "product_id": product_id,
         "period": period,
@@ -131,19 +169,18 @@ def predicao_demanda(product_id: str, period: str) -> Dict[str, Any]:
         "monthly_estimate": monthly,
         "total_estimate": total,
         "confidence": conf,
-        "generated_at": datetime.utcnow().isoformat() + "Z"
-    }
+        "generated_at": _now(fields)
+    }, fields)
 
 # Classificação de sentimento (simples lexicon)
 _POS = {"bom", "ótimo", "otimo", "excelente", "gostei", "adorei", "satisfeito", "fantástico", "positivo", "feliz", "maravilhoso"}
 _NEG = {"ruim", "péssimo", "pessimo", "detestei", "ódio", "odio", "insatisfeito", "horrível", "horrivel", "negativo", "triste"}
 
-def classificacao_sentimento(text: str) -> Dict[str, Any]:
-    txt = text.lower()
-    # token simples
-    words = re.findall(r"\w+", txt, flags=re.UNICODE)
-    pos = sum(1 for w in words if w in _POS)
-    neg = sum(1 for w in words if w in _NEG)
+_WORD_RE = re.compile(r"\w+", flags=re.UNICODE)
+# palavras maiores que isso não podem estar no léxico
+_MAX_WORD_LEN = max(len(w) for w in _POS | _NEG)
+
+def _sentimento(pos: int, neg: int) -> Dict[str, Any]:
     raw_score = pos - neg  # integer
     # normaliza entre -1 e 1
     if pos + neg == 0:
@@ -160,12 +197,67 @@ def classificacao_sentimento(text: str) -> Dict[str, Any]:
     # confidence depends on number of sentiment words
     conf = round(min(0.99, 0.5 + 0.1 * (pos + neg)), 3)
     return {
-        "model": "classificacaoSentimento_sim",
-        "text": text,
         "pos_count": pos,
         "neg_count": neg,
         "score": round(score, 3),
         "label": label,
         "confidence": conf,
-        "generated_at": datetime.utcnow().isoformat() + "Z"
-    }
\ No newline at end of file
+    }
+
+def classificacao_sentimento(text: str, fields: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
+    pos = neg = 0
+    # token simples
+    for m in _WORD_RE.finditer(text.lower()):
+        w = m.group()
+        if w in _POS:
+            pos += 1
+        elif w in _NEG:
+            neg += 1
+    return _select({
+        "model": "classificacaoSentimento_sim",
+        "text": text,
+        **_sentimento(pos, neg),
+        "generated_at": _now(fields)
+    }, fields)
+
+class SentimentoStream:
+    """
+    Classificação de sentimento incremental: o texto chega em pedaços via
+    feed() e só as contagens ficam em memória. Uma palavra cortada no fim
+    de um pedaço é guardada e completada pelo pedaço seguinte.
+    """
+
+    def __init__(self):
+        self.pos = 0
+        self.neg = 0
+        self.chars = 0
+        self._tail = ""
+
+    def _count(self, w: str):
+        if w in _POS:
+            self.pos += 1
+        elif w in _NEG:
+            self.neg += 1
+
+    def feed(self, chunk: str):
+        self.chars += len(chunk)
+        txt = self._tail + chunk.lower()
+        self._tail = ""
+        for m in _WORD_RE.finditer(txt):
+            if m.end() == len(txt):
+                # pode continuar no próximo pedaço; palavra longa demais é
+                # truncada (continua longa demais e nunca casa com o léxico)
+                self._tail = m.group()[:_MAX_WORD_LEN + 1]
+            else:
+                self._count(m.group())
+
+    def result(self, fields: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
+        if self._tail:
+            self._count(self._tail)
+            self._tail = ""
+        return _select({
+            "model": "classificacaoSentimento_sim",
+            "chars": self.chars,
+            **_sentimento(self.pos, self.neg),
+            "generated_at": _now(fields)
+        }, fields)
\ No newline at end of file
@@ -0,0 +1,85 @@
+# msgpack_codec.py
+# Corpo de requisição/resposta em MessagePack, escolhido por Content-Type / Accept.
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+import content_negotiation
+
+try:
+    import msgpack
+except ImportError:  # msgpack é opcional: sem ele só JSON fica disponível
+    msgpack = None
+
+MSGPACK = "application/msgpack"
+_ALIASES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+
+
+def available() -> bool:
+    return msgpack is not None
+
+
+def media_types() -> Tuple[str, ...]:
+    # tipos msgpack que podem ser oferecidos na negociação do Accept
+    return _ALIASES if msgpack is not None else ()
+
+
+def _media_types(header: Optional[str]):
+    if not header:
+        return []
+    return [part.split(";")[0].strip().lower() for part in header.split(",")]
+
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    media = _media_types(content_type)
+    return bool(media) and media[0] in _ALIASES
+
+
+def accepts(accept: Optional[str]) -> bool:
+    """
+    True se, pelos q-values do header Accept, msgpack é preferido a JSON.
+    Sem msgpack instalado a resposta continua em JSON.
+    """
+    if msgpack is None:
+        return False
+    best = content_negotiation.negotiate(accept, ("application/json",) + _ALIASES, default="application/json")
+    return best in _ALIASES
+
+
+class MsgpackResponse(Response):
+    media_type = MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+class MsgpackRequest(Request):
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body(), raw=False)
+        return self._json
+
+
+class MsgpackRoute(APIRoute):
+    """
+    Rota que aceita corpo msgpack. O FastAPI só entrega o corpo ao modelo
+    Pydantic quando o Content-Type é JSON, então a requisição é trocada por
+    uma MsgpackRequest que se apresenta como JSON e decodifica msgpack em
+    json(). A validação dos modelos é exatamente a mesma.
+    """
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type")):
+                if msgpack is None:
+                    raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="msgpack support is not installed")
+                scope = dict(request.scope)
+                scope["headers"] = [(k, v) for k, v in request.scope["headers"] if k != b"content-type"]
+                scope["headers"].append((b"content-type", b"application/json"))
+                request = MsgpackRequest(scope, request.receive)
+            return await original_route_handler(request)
+
+        return route_handler
@@ -1,15 +1,25 @@
 import requests
 import json
+import io
 
 BASE_URL = "http://127.0.0.1:8000"
 VALID_TOKEN = "secrettoken123"
 INVALID_TOKEN = "tokenInvalido"
 
-def call_api(endpoint, payload=None, token=None):
+def call_api_msgpack(endpoint, payload, token=None):
+    import msgpack
+    headers = {"Content-Type": "application/msgpack", "Accept": "application/msgpack"}
+    if token is not None:
+        headers["Authorization"] = token
+    return requests.post(f"{BASE_URL}{endpoint}", headers=headers, data=msgpack.packb(payload))
+
+def call_api(endpoint, payload=None, token=None, extra_headers=None):
     url = f"{BASE_URL}{endpoint}"
     headers = {"Content-Type": "application/json"}
     if token is not None:
         headers["Authorization"] = token
+    if extra_headers:
+        headers.update(extra_headers)
     resp = requests.post(url, headers=headers, data=json.dumps(payload) if payload else None)
     return resp
 
@@ -103,6 +113,253 @@ def test_sentimento_texto_vazio():
     assert r.status_code == 200
     assert r.json().get("label") == "neutral"
 
+# ------------------------------------
+# 6. Testes das rotas em lote (JSON / Arrow / Parquet)
+# ------------------------------------
+
+DEMANDA_LOTE = {"items": [
+    {"product_id": "SKU-1", "period": "2025-09:2025-11"},
+    {"product_id": "SKU-2", "period": "2025-09"},
+]}
+
+def test_lote_demanda_json():
+    r = call_api("/predicaoDemanda/batch", DEMANDA_LOTE, token=f"Bearer {VALID_TOKEN}")
+    assert r.status_code == 200
+    assert [len(x["monthly_estimate"]) for x in r.json()] == [3, 1]
+
+def test_lote_demanda_arrow():
+    import pyarrow.ipc as ipc
+    r = call_api("/predicaoDemanda/batch", DEMANDA_LOTE, token=f"Bearer {VALID_TOKEN}",
+                 extra_headers={"Accept": "application/vnd.apache.arrow.stream"})
+    assert r.status_code == 200
+    table = ipc.open_stream(r.content).read_all()
+    assert table.num_rows == 2
+    assert table.column("monthly_estimate").to_pylist()[0] == r_json_monthly("SKU-1", "2025-09:2025-11")
+
+def test_lote_cliente_parquet():
+    import pyarrow.parquet as pq
+    r = call_api("/classificacaoCliente/batch", {"items": [{"cpf": "111.444.777-35"}, {"cpf": "12345"}]},
+                 token=f"Bearer {VALID_TOKEN}", extra_headers={"Accept": "application/vnd.apache.parquet"})
+    assert r.status_code == 200
+    table = pq.read_table(io.BytesIO(r.content))
+    assert table.column("valid_cpf").to_pylist() == [True, False]
+
+def test_lote_accept_q_zero():
+    # q=0 significa "não aceito": o Parquet é recusado mesmo vindo primeiro
+    r = call_api("/classificacaoCliente/batch", {"items": [{"cpf": "11144477735"}]}, token=f"Bearer {VALID_TOKEN}",
+                 extra_headers={"Accept": "application/vnd.apache.parquet;q=0, application/vnd.apache.arrow.stream"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.apache.arrow.stream"
+
+def test_lote_accept_nada_aceitavel():
+    r = call_api("/classificacaoCliente/batch", {"items": [{"cpf": "11144477735"}]}, token=f"Bearer {VALID_TOKEN}",
+                 extra_headers={"Accept": "application/json;q=0, text/csv"})
+    assert r.status_code == 406
+
+def test_lote_demanda_periodo_invalido():
+    payload = {"items": [{"product_id": "SKU-1", "period": "2025-11:2025-09"}]}
+    r = call_api("/predicaoDemanda/batch", payload, token=f"Bearer {VALID_TOKEN}")
+    assert r.status_code == 400
+
+def r_json_monthly(product_id, period):
+    r = call_api("/predicaoDemanda", {"product_id": product_id, "period": period}, token=f"Bearer {VALID_TOKEN}")
+    return r.json()["monthly_estimate"]
+
+# ------------------------------------
+# 7. Testes do protocolo msgpack
+# ------------------------------------
+
+def test_msgpack_classificacao_cliente():
+    import msgpack
+    r = call_api_msgpack("/classificacaoCliente", {"cpf":"111.444.777-35"}, token=f"Bearer {VALID_TOKEN}")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/msgpack"
+    body = msgpack.unpackb(r.content)
+    assert body["valid_cpf"] is True and "category" in body
+
+def test_msgpack_predicao_demanda():
+    import msgpack
+    r = call_api_msgpack("/predicaoDemanda", {"product_id":123,"period":"2025-09:2025-11"}, token=f"Bearer {VALID_TOKEN}")
+    assert r.status_code == 200
+    assert len(msgpack.unpackb(r.content)["monthly_estimate"]) == 3
+
+def test_msgpack_validacao():
+    r = call_api_msgpack("/predicaoVenda", {"mes":13,"ano":2025}, token=f"Bearer {VALID_TOKEN}")
+    assert r.status_code == 422
+
+def test_msgpack_accept_q_zero():
+    # q=0 recusa msgpack: resposta em JSON, e o ETag é o da representação JSON
+    r = call_api("/classificacaoCliente", {"cpf":"11144477735"}, token=f"Bearer {VALID_TOKEN}",
+                 extra_headers={"Accept": "application/msgpack;q=0, application/json"})
+    r_json = call_api("/classificacaoCliente", {"cpf":"11144477735"}, token=f"Bearer {VALID_TOKEN}")
+    assert r.headers["content-type"] == "application/json"
+    assert r.headers["ETag"] == r_json.headers["ETag"]
+
+def test_msgpack_accept_curinga():
+    # JSON vale q=0.5 e msgpack herda q=1 do */*: msgpack é o preferido
+    r = call_api("/classificacaoCliente", {"cpf":"11144477735"}, token=f"Bearer {VALID_TOKEN}",
+                 extra_headers={"Accept": "application/json;q=0.5, */*"})
+    assert r.headers["content-type"] == "application/msgpack"
+    r_lote = call_api("/classificacaoCliente/batch", {"items": [{"cpf":"11144477735"}]}, token=f"Bearer {VALID_TOKEN}",
+                      extra_headers={"Accept": "application/json;q=0.5, */*"})
+    assert r_lote.headers["content-type"] == "application/msgpack"
+
+def test_msgpack_corpo_invalido():
+    r = requests.post(f"{BASE_URL}/classificacaoCliente", data=b"\xc1",
+                      headers={"Content-Type": "application/msgpack", "Authorization": f"Bearer {VALID_TOKEN}"})
+    assert r.status_code == 400
+
+# ------------------------------------
+# 8. Testes de ETag / requisição condicional
+# ------------------------------------
+
+def test_etag_estavel():
+    r1 = call_api("/predicaoVenda", {"mes":12,"ano":2025}, token=f"Bearer {VALID_TOKEN}")
+    r2 = call_api("/predicaoVenda", {"mes":12,"ano":2025}, token=f"Bearer {VALID_TOKEN}")
+    assert r1.headers["ETag"] == r2.headers["ETag"]
+    assert "max-age" in r1.headers["Cache-Control"]
+
+def test_etag_304():
+    r = call_api("/predicaoDemanda", {"product_id":"SKU-1","period":"2025-09:2025-11"}, token=f"Bearer {VALID_TOKEN}")
+    etag = r.headers["ETag"]
+    r2 = call_api("/predicaoDemanda", {"product_id":"SKU-1","period":"2025-09:2025-11"}, token=f"Bearer {VALID_TOKEN}",
+                  extra_headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.content == b""
+
+def test_etag_entrada_diferente():
+    r = call_api("/classificacaoCliente", {"cpf":"11144477735"}, token=f"Bearer {VALID_TOKEN}")
+    r2 = call_api("/classificacaoCliente", {"cpf":"12345678909"}, token=f"Bearer {VALID_TOKEN}",
+                  extra_headers={"If-None-Match": r.headers["ETag"]})
+    assert r2.status_code == 200
+    assert r2.headers["ETag"] != r.headers["ETag"]
+
+# ------------------------------------
+# 9. Testes do cliente assíncrono (client.py)
+# ------------------------------------
+
+def test_cliente_async_lote():
+    import asyncio
+    from client import IAServiceClient
+
+    async def run():
+        async with IAServiceClient(BASE_URL, token=VALID_TOKEN, batch_window=0.01) as api:
+            return await asyncio.gather(api.classificacao_cliente("111.444.777-35"),
+                                        api.classificacao_cliente("12345"),
+                                        api.predicao_venda(12, 2025))
+    c1, c2, v = asyncio.run(run())
+    assert c1["valid_cpf"] is True and c2["valid_cpf"] is False
+    assert "predicted_sales" in v
+
+def test_cliente_async_erro_isolado():
+    import asyncio
+    from client import IAServiceClient, IAServiceError
+
+    async def run():
+        async with IAServiceClient(BASE_URL, token=VALID_TOKEN, batch_window=0.01) as api:
+            return await asyncio.gather(api.predicao_demanda("SKU-1", "2025-09"),
+                                        api.predicao_demanda("SKU-1", "2025-11:2025-09"),
+                                        return_exceptions=True)
+    ok, err = asyncio.run(run())
+    assert ok["months"] == 1
+    assert isinstance(err, IAServiceError) and err.status_code == 400
+
+# ------------------------------------
+# 10. Testes do sentimento em streaming
+# ------------------------------------
+
+def call_api_stream(chunks, token=None):
+    headers = {"Content-Type": "text/plain; charset=utf-8"}
+    if token is not None:
+        headers["Authorization"] = token
+    return requests.post(f"{BASE_URL}/classificacaoSentimento/stream", headers=headers, data=iter(chunks))
+
+def test_sentimento_stream_palavra_cortada():
+    # "ótimo" e "péssimo" chegam divididos entre pedaços, inclusive no meio de um caractere UTF-8
+    texto = "Adorei, foi ótimo e excelente, nada péssimo. ".encode("utf-8")
+    corte = texto.index("ó".encode("utf-8")) + 1
+    chunks = [texto[:corte], texto[corte:corte + 5], texto[corte + 5:]] * 50
+    r = call_api_stream(chunks, token=f"Bearer {VALID_TOKEN}")
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["pos_count"], body["neg_count"]) == (150, 50)
+    assert body["label"] == "positive"
+    assert "text" not in body
+
+def test_sentimento_stream_igual_unitario():
+    texto = "O produto foi péssimo, detestei, mas a entrega foi boa"
+    r1 = call_api("/classificacaoSentimento", {"text": texto}, token=f"Bearer {VALID_TOKEN}")
+    r2 = call_api_stream([texto[i:i + 3].encode("utf-8") for i in range(0, len(texto), 3)], token=f"Bearer {VALID_TOKEN}")
+    for k in ("pos_count", "neg_count", "score", "label", "confidence"):
+        assert r1.json()[k] == r2.json()[k]
+
+def test_sentimento_stream_charset():
+    def post(charset, body):
+        return requests.post(f"{BASE_URL}/classificacaoSentimento/stream", data=body,
+                             headers={"Content-Type": f"text/plain; charset={charset}", "Authorization": f"Bearer {VALID_TOKEN}"})
+    assert post("latin-1", "péssimo".encode("latin-1")).json()["label"] == "negative"
+    assert post("utf-16", "bom".encode("utf-16")).json()["label"] == "positive"
+    # UTF-16 sem BOM e bytes inválidos: corpo mal codificado
+    assert post("utf-16", b"b\x00o\x00m\x00").status_code == 400
+    assert post("utf-8", b"\xff\xfe").status_code == 400
+    # codecs que não são charsets de texto
+    for charset in ("base64", "hex", "zlib", "bz2", "uu", "rot13", "nao-existe"):
+        assert post(charset, b"Ym9t").status_code == 415
+
+def test_cliente_stream_iteravel_sincrono():
+    import asyncio
+    from client import IAServiceClient
+
+    def gerador():
+        yield "foi ót".encode("utf-8")
+        yield "imo".encode("utf-8")
+
+    async def run():
+        async with IAServiceClient(BASE_URL, token=VALID_TOKEN) as api:
+            return await asyncio.gather(api.classificacao_sentimento_stream([b"ruim ", b"e triste"]),
+                                        api.classificacao_sentimento_stream(gerador()))
+    lista, gen = asyncio.run(run())
+    assert lista["neg_count"] == 2
+    assert gen["pos_count"] == 1
+
+def test_sentimento_stream_sem_token():
+    r = call_api_stream([b"bom"])
+    assert r.status_code == 401
+
+# ------------------------------------
+# 11. Testes de projeção de campos (?fields=)
+# ------------------------------------
+
+def test_fields_demanda():
+    r = call_api("/predicaoDemanda?fields=total_estimate,confidence", {"product_id":"SKU-1","period":"2025-01:2025-12"},
+                 token=f"Bearer {VALID_TOKEN}")
+    assert r.status_code == 200
+    assert set(r.json()) == {"total_estimate", "confidence"}
+    completo = call_api("/predicaoDemanda", {"product_id":"SKU-1","period":"2025-01:2025-12"}, token=f"Bearer {VALID_TOKEN}")
+    assert r.json()["total_estimate"] == sum(completo.json()["monthly_estimate"])
+
+def test_fields_desconhecido():
+    r = call_api("/classificacaoCliente?fields=score,foo", {"cpf":"11144477735"}, token=f"Bearer {VALID_TOKEN}")
+    assert r.status_code == 400
+
+def test_fields_etag_por_projecao():
+    r1 = call_api("/classificacaoCliente?fields=score", {"cpf":"11144477735"}, token=f"Bearer {VALID_TOKEN}")
+    r2 = call_api("/classificacaoCliente", {"cpf":"11144477735"}, token=f"Bearer {VALID_TOKEN}")
+    assert r1.headers["ETag"] != r2.headers["ETag"]
+
+def test_fields_lote_arrow():
+    import pyarrow.ipc as ipc
+    r = call_api("/classificacaoSentimento/batch?fields=label", {"items": [{"text": "ótimo"}, {"text": "ruim"}]},
+                 token=f"Bearer {VALID_TOKEN}", extra_headers={"Accept": "application/vnd.apache.arrow.stream"})
+    table = ipc.open_stream(r.content).read_all()
+    assert table.column_names == ["label"]
+    assert table.column("label").to_pylist() == ["positive", "negative"]
+
+def test_fields_stream():
+    r = requests.post(f"{BASE_URL}/classificacaoSentimento/stream?fields=label,chars", data="foi ótimo".encode("utf-8"),
+                      headers={"Content-Type": "text/plain; charset=utf-8", "Authorization": f"Bearer {VALID_TOKEN}"})
+    assert r.json() == {"chars": 9, "label": "positive"}
+
 # ---------------------------
 # Executar todos os testes
 # ---------------------------
@@ -124,4 +381,31 @@ if __name__ == "__main__":
     test_sentimento_negativo()
     test_sentimento_neutro()
     test_sentimento_texto_vazio()
+    test_lote_demanda_json()
+    test_lote_demanda_arrow()
+    test_lote_cliente_parquet()
+    test_lote_accept_q_zero()
+    test_lote_accept_nada_aceitavel()
+    test_lote_demanda_periodo_invalido()
+    test_msgpack_classificacao_cliente()
+    test_msgpack_predicao_demanda()
+    test_msgpack_validacao()
+    test_msgpack_accept_q_zero()
+    test_msgpack_accept_curinga()
+    test_msgpack_corpo_invalido()
+    test_etag_estavel()
+    test_etag_304()
+    test_etag_entrada_diferente()
+    test_cliente_async_lote()
+    test_cliente_async_erro_isolado()
+    test_sentimento_stream_palavra_cortada()
+    test_sentimento_stream_igual_unitario()
+    test_sentimento_stream_charset()
+    test_cliente_stream_iteravel_sincrono()
+    test_sentimento_stream_sem_token()
+    test_fields_demanda()
+    test_fields_desconhecido()
+    test_fields_etag_por_projecao()
+    test_fields_lote_arrow()
+    test_fields_stream()
     print("==== Testes Finalizados ====")